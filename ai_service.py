@@ -6,179 +6,345 @@ AI Service for MediCare System
 - NLP query processing
 """
 
-try:
-    import numpy as np
-    from sklearn.ensemble import RandomForestRegressor
-    from sklearn.preprocessing import StandardScaler
-    ML_AVAILABLE = True
-except ImportError:
-    ML_AVAILABLE = False
-    # Fallback for when scikit-learn is not available
-    np = None
+import numpy as np
 
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from collections import defaultdict
+from functools import lru_cache
+import importlib.util
 import re
-from typing import Dict, List, Tuple, Optional
-import pickle
+import sys
+from typing import Dict, List, Tuple, Optional, Union
+import hashlib
 import os
 
+# scikit-learn is imported lazily by AppointmentScheduler; only check it exists
+ML_AVAILABLE = importlib.util.find_spec('sklearn') is not None
+# Optional: compile the trained model to native code with Treelite + TL2cgen
+TREELITE_AVAILABLE = (importlib.util.find_spec('treelite') is not None
+                      and importlib.util.find_spec('tl2cgen') is not None)
+
+# Trained models are persisted here, keyed by a hash of their training data
+MODEL_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+# How many of the most recent saved models (and their libraries) to keep there
+MODEL_CACHE_KEEP = 3
+
+
+def _iso_prefix(value) -> str:
+    """'YYYY-MM-DDTHH:MM:SS' part of a date value; 'NaT' when there is none.
+    
+    Any zone suffix is cut off so times stay wall-clock, as with fromisoformat.
+    """
+    if isinstance(value, str):
+        return value[:19]
+    if isinstance(value, datetime):
+        return value.isoformat()[:19]
+    return 'NaT'
+
+
+def _parse_dates(appointments_data: List[Dict]):
+    """Parse appointment dates into a datetime64 array plus the source row indices.
+    
+    Rows whose date is missing or unparseable are dropped, matching the
+    per-row skip behaviour of the original loops.
+    """
+    prefixes = [_iso_prefix(appt.get('date')) for appt in appointments_data]
+    try:
+        # Bulk C parse; the common case of all-valid ISO strings
+        dates = np.array(prefixes, dtype='datetime64[s]')
+    except ValueError:
+        # Some string is malformed: coerce the bad ones to NaT in one pass
+        # rather than raising and catching per row
+        import pandas as pd
+        dates = pd.to_datetime(pd.Series(prefixes, dtype=object), format='ISO8601',
+                               errors='coerce').to_numpy('datetime64[s]')
+    valid = ~np.isnat(dates)
+    return dates[valid], np.flatnonzero(valid)
+
+
+@dataclass
+class ApptTable:
+    """Appointment history as parallel arrays (struct-of-arrays).
+    
+    Build it once per request with from_dicts() and hand the same table to
+    every consumer instead of re-reading a list of dicts in each one.
+    """
+    dates: np.ndarray  # datetime64[s], wall-clock
+    doctor_ids: np.ndarray  # int64
+    history_counts: np.ndarray  # float64, patient appointment frequency
+    
+    @classmethod
+    def from_dicts(cls, appointments_data: List[Dict]) -> 'ApptTable':
+        """Convert appointment dicts; rows without a usable date are dropped"""
+        dates, rows = _parse_dates(appointments_data)
+        rows = rows.tolist()
+        doctor_ids = np.array([appointments_data[i].get('doctor_id') or 0 for i in rows],
+                              dtype=np.int64)
+        history_counts = np.array([appointments_data[i].get('patient_history_count', 0) for i in rows],
+                                  dtype=np.float64)
+        return cls(dates, doctor_ids, history_counts)
+    
+    def __len__(self) -> int:
+        return len(self.dates)
+
+
+def _as_table(appointments: Union[List[Dict], ApptTable]) -> ApptTable:
+    """Accept either an ApptTable or the legacy list of dicts"""
+    if isinstance(appointments, ApptTable):
+        return appointments
+    return ApptTable.from_dicts(appointments)
+
+
+# Candidate appointment slots, 9 AM to 5 PM every 30 minutes;
+# slot index = (hour - 9) * 2 + minute // 30
+_SLOT_HOURS = np.repeat(np.arange(9, 17), 2)
+_SLOT_MINUTES = np.tile([0, 30], 8)
+
+
+def _heuristic_scores(hours: np.ndarray) -> np.ndarray:
+    """Fallback slot scores: prefer mid-morning and early afternoon"""
+    return np.where((hours >= 10) & (hours <= 14), 0.8,
+                    np.where((hours >= 9) & (hours <= 15), 0.6, 0.4))
+
+
+def _library_path(model_path: str) -> str:
+    """Path of the compiled shared library stored next to a saved model"""
+    ext = '.dll' if os.name == 'nt' else ('.dylib' if sys.platform == 'darwin' else '.so')
+    return os.path.splitext(model_path)[0] + ext
+
+
+def _date_fields(dates):
+    """Return (hour, weekday, month) integer arrays for a datetime64 array"""
+    hours = dates.astype('datetime64[h]').astype(np.int64) % 24
+    # 1970-01-01 was a Thursday (weekday 3)
+    weekdays = (dates.astype('datetime64[D]').astype(np.int64) + 3) % 7
+    months = dates.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    return hours, weekdays, months
+
+
+def _feature_matrix(hours, weekdays, months, doctor_ids, history_counts):
+    """Stack normalized features: hour, day_of_week, month, doctor_id, patient_history_count"""
+    return np.column_stack([
+        hours / 24.0,  # Normalized hour
+        weekdays / 6.0,  # Normalized day
+        months / 12.0,  # Normalized month
+        doctor_ids / 100.0,  # Normalized doctor ID
+        history_counts / 10.0,  # Patient appointment frequency
+    ])
+
 
 class AppointmentScheduler:
     """ML-based appointment auto-scheduling"""
     
     def __init__(self):
         self.model = None
-        self.scaler = StandardScaler()
+        self.predictor = None  # compiled model, when Treelite is installed
         self.is_trained = False
-        
-    def _extract_features(self, appointments_data: List[Dict], doctor_id: int, 
-                         preferred_date: Optional[str] = None) -> List[List[float]]:
+        self.cache_dir = MODEL_CACHE_DIR
+    
+    @staticmethod
+    def _load_ml():
+        """Import scikit-learn on first use so non-ML code paths don't pay for it"""
+        from sklearn.ensemble import HistGradientBoostingRegressor
+        return HistGradientBoostingRegressor
+    
+    def _compile_model(self, libpath: str):
+        """Compile self.model into a shared library at libpath, reusing an
+        existing build; returns None if that fails"""
+        try:
+            import treelite
+            import tl2cgen
+            
+            if not os.path.exists(libpath):
+                tmp_path = f'{libpath}.{os.getpid()}.tmp{os.path.splitext(libpath)[1]}'
+                tl2cgen.export_lib(treelite.sklearn.import_model(self.model),
+                                   toolchain='msvc' if os.name == 'nt' else 'gcc',
+                                   libpath=tmp_path, params={'parallel_comp': os.cpu_count() or 1})
+                os.replace(tmp_path, libpath)
+            return tl2cgen.Predictor(libpath)
+        except Exception as e:
+            print(f"Model compilation skipped: {e}")
+            return None
+    
+    def _cache_path(self, X: np.ndarray, y: np.ndarray) -> str:
+        """Model file for this exact training set"""
+        digest = hashlib.md5(X.tobytes() + y.tobytes()).hexdigest()[:12]
+        return os.path.join(self.cache_dir, f'appt_model_{digest}.joblib')
+    
+    def save(self, path: str):
+        """Persist the trained model with joblib"""
+        import joblib
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        joblib.dump(self.model, tmp_path, compress=3)
+        os.replace(tmp_path, path)
+    
+    def load(self, path: str) -> bool:
+        """Load a model written by save(); returns False if none is usable"""
+        if not (ML_AVAILABLE and os.path.exists(path)):
+            return False
+        try:
+            import joblib
+            self.model = joblib.load(path)
+        except Exception as e:
+            print(f"Model load failed: {e}")
+            return False
+        self.predictor = self._compile_model(_library_path(path)) if TREELITE_AVAILABLE else None
+        self.is_trained = True
+        return True
+    
+    def _saved_models(self) -> List[str]:
+        """Saved model files in cache_dir, newest first"""
+        try:
+            paths = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                     if name.startswith('appt_model_') and name.endswith('.joblib')]
+        except OSError:
+            return []
+        return sorted(paths, key=os.path.getmtime, reverse=True)
+    
+    def _prune_cache(self):
+        """Delete all but the newest MODEL_CACHE_KEEP models and their libraries"""
+        for path in self._saved_models()[MODEL_CACHE_KEEP:]:
+            for stale in (path, _library_path(path)):
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    # e.g. a library still loaded by another process on Windows
+                    print(f"Could not remove cached model file {stale}: {e}")
+    
+    def load_latest(self) -> bool:
+        """Load the most recently written model in cache_dir, if there is one"""
+        paths = self._saved_models()
+        return bool(paths) and self.load(paths[0])
+    
+    def _predict(self, feats: np.ndarray) -> np.ndarray:
+        """Score a feature matrix, preferring the compiled predictor"""
+        if self.predictor is not None:
+            import tl2cgen
+            return self.predictor.predict(tl2cgen.DMatrix(feats)).reshape(-1)
+        return self.model.predict(feats)
+    
+    def _extract_features(self, appointments_data: Union[List[Dict], ApptTable], doctor_id: int, 
+                         preferred_date: Optional[str] = None) -> np.ndarray:
         """Extract features from appointment history"""
-        features = []
-        for appt in appointments_data:
-            try:
-                dt = datetime.fromisoformat(appt['date']) if isinstance(appt['date'], str) else appt['date']
-                hour = dt.hour
-                day_of_week = dt.weekday()
-                month = dt.month
-                
-                # Features: hour, day_of_week, month, doctor_id, patient_history_count
-                feat = [
-                    hour / 24.0,  # Normalized hour
-                    day_of_week / 6.0,  # Normalized day
-                    month / 12.0,  # Normalized month
-                    doctor_id / 100.0,  # Normalized doctor ID
-                    appt.get('patient_history_count', 0) / 10.0,  # Patient appointment frequency
-                ]
-                features.append(feat)
-            except:
-                continue
-        return features
+        table = _as_table(appointments_data)
+        hours, weekdays, months = _date_fields(table.dates)
+        return _feature_matrix(hours, weekdays, months, np.full(len(table), doctor_id),
+                               table.history_counts)
     
-    def train_model(self, appointments_data: List[Dict]):
+    def train_model(self, appointments_data: Union[List[Dict], ApptTable]):
         """Train the model on historical appointment data"""
         if len(appointments_data) < 10:
             # Not enough data, use simple heuristic
             self.is_trained = False
             return
         
+        if not ML_AVAILABLE:
+            # ML not available, use heuristic mode
+            self.is_trained = False
+            return
+        
         try:
-            X = []
-            y = []
+            table = _as_table(appointments_data)
+            hours, weekdays, months = _date_fields(table.dates)
+            doctor_ids = table.doctor_ids
             
-            # Group by doctor and date to create training samples
-            doctor_schedules = defaultdict(lambda: defaultdict(int))
-            for appt in appointments_data:
-                try:
-                    dt = datetime.fromisoformat(appt['date'])
-                    doctor_id = appt.get('doctor_id', 0)
-                    hour = dt.hour
-                    day_of_week = dt.weekday()
-                    doctor_schedules[doctor_id][(day_of_week, hour)] += 1
-                except:
-                    continue
+            # Group by doctor and (weekday, hour) with one histogram over packed keys;
+            # doctors are compacted to 0..D-1 so the key space stays dense
+            doctor_idx = np.unique(doctor_ids, return_inverse=True)[1].reshape(-1)
+            slot_keys = (doctor_idx * 7 + weekdays) * 24 + hours
+            slot_counts = np.bincount(slot_keys)
             
             # Create features and targets
-            for appt in appointments_data:
-                try:
-                    dt = datetime.fromisoformat(appt['date'])
-                    doctor_id = appt.get('doctor_id', 0)
-                    
-                    feat = [
-                        dt.hour / 24.0,
-                        dt.weekday() / 6.0,
-                        dt.month / 12.0,
-                        doctor_id / 100.0,
-                        appt.get('patient_history_count', 0) / 10.0,
-                    ]
-                    
-                    # Target: popularity score (how many appointments at this time)
-                    target = doctor_schedules[doctor_id].get((dt.weekday(), dt.hour), 0)
-                    
-                    X.append(feat)
-                    y.append(target)
-                except:
-                    continue
+            X = _feature_matrix(hours, weekdays, months, doctor_ids, table.history_counts)
+            # Target: popularity score (how many appointments at this time)
+            y = slot_counts[slot_keys]
             
-            if len(X) > 5 and ML_AVAILABLE:
-                X = np.array(X)
-                y = np.array(y)
-                
-                self.scaler.fit(X)
-                X_scaled = self.scaler.transform(X)
+            if len(X) > 5:
+                # Same training rows -> same model; reuse it from a previous run
+                path = self._cache_path(X, y)
+                if self.load(path):
+                    # Mark it newest so pruning and load_latest() treat it as current
+                    os.utime(path)
+                    return
                 
-                self.model = RandomForestRegressor(n_estimators=50, random_state=42, max_depth=5)
-                self.model.fit(X_scaled, y)
+                HistGradientBoostingRegressor = self._load_ml()
+                # Histogram GBDT: far cheaper predict calls than a 50-tree forest.
+                # Trees are invariant to feature scaling, so X (already
+                # normalized by _feature_matrix) is fitted as-is.
+                # Fit a local model so a request served meanwhile never sees
+                # an unfitted one
+                model = HistGradientBoostingRegressor(max_iter=50, max_depth=5, random_state=42)
+                model.fit(X, y)
+                self.model = model
+                self.save(path)
+                self._prune_cache()
+                self.predictor = self._compile_model(_library_path(path)) if TREELITE_AVAILABLE else None
                 self.is_trained = True
-            elif len(X) > 5:
-                # ML not available, use heuristic mode
-                self.is_trained = False
         except Exception as e:
             print(f"Training error: {e}")
             self.is_trained = False
     
     def suggest_optimal_times(self, doctor_id: int, date: str, 
-                             existing_appointments: List[Dict],
-                             appointments_history: List[Dict] = None) -> List[Dict]:
-        """Suggest optimal appointment times using ML"""
+                             existing_appointments: Union[List[Dict], ApptTable],
+                             appointments_history: Union[List[Dict], ApptTable, bool] = None) -> List[Dict]:
+        """Suggest optimal appointment times using ML
+        
+        appointments_history is only tested for being non-empty, so a bool saying
+        whether any history exists will do.
+        """
         try:
             target_date = datetime.fromisoformat(date) if isinstance(date, str) else date
             if isinstance(target_date, str):
                 target_date = datetime.strptime(date, '%Y-%m-%d')
             
-            # Generate candidate time slots
-            slots = []
-            for hour in range(9, 17):  # 9 AM to 5 PM
-                for minute in [0, 30]:
-                    slot_time = target_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
-                    slots.append(slot_time)
+            # Filter out occupied slots, tracked as one bit per slot index
+            booked = _as_table(existing_appointments).dates
+            booked_hours = booked.astype('datetime64[h]').astype(np.int64) % 24
+            booked_minutes = booked.astype('datetime64[m]').astype(np.int64) % 60
+            on_grid = (booked_hours >= 9) & (booked_hours < 17) & (booked_minutes % 30 == 0)
+            slot_idx = (booked_hours[on_grid] - 9) * 2 + booked_minutes[on_grid] // 30
+            occupied_mask = int(np.bitwise_or.reduce(np.left_shift(1, slot_idx), initial=0))
             
-            # Filter out occupied slots
-            occupied_times = set()
-            for appt in existing_appointments:
-                try:
-                    appt_time = datetime.fromisoformat(appt['date'])
-                    occupied_times.add((appt_time.hour, appt_time.minute))
-                except:
-                    continue
+            # Score available slots, kept as (hour, minute) ints until formatting
+            free = np.flatnonzero((occupied_mask >> np.arange(len(_SLOT_HOURS))) & 1 == 0)
+            if not len(free):
+                return []
+            hours = _SLOT_HOURS[free]
             
-            # Score available slots
+            if self.is_trained and appointments_history and ML_AVAILABLE:
+                # Use ML model to score all free slots in one batched predict
+                n = len(free)
+                feats = _feature_matrix(
+                    hours,
+                    np.full(n, target_date.weekday()),
+                    np.full(n, target_date.month),
+                    np.full(n, doctor_id),
+                    np.zeros(n)  # New patient
+                )
+                scores = self._predict(feats)
+            else:
+                scores = _heuristic_scores(hours)
+            
+            # Rank on the score array and format only the top 5 suggestions.
+            # A stable sort keeps earlier slots first among equal scores.
+            top = np.argsort(-scores, kind='stable')[:5]
+            
+            # Loop invariants hoisted out of the formatting loop
+            day_start = target_date.replace(second=0, microsecond=0)
+            reason = 'ML recommended' if self.is_trained else 'Heuristic'
             scored_slots = []
-            for slot in slots:
-                if (slot.hour, slot.minute) in occupied_times:
-                    continue
-                
-                if self.is_trained and appointments_history and ML_AVAILABLE:
-                    # Use ML model to score
-                    feat = np.array([[
-                        slot.hour / 24.0,
-                        slot.weekday() / 6.0,
-                        slot.month / 12.0,
-                        doctor_id / 100.0,
-                        0.0  # New patient
-                    ]])
-                    feat_scaled = self.scaler.transform(feat)
-                    score = self.model.predict(feat_scaled)[0]
-                else:
-                    # Use heuristic: prefer mid-morning and early afternoon
-                    if 10 <= slot.hour <= 14:
-                        score = 0.8
-                    elif 9 <= slot.hour <= 15:
-                        score = 0.6
-                    else:
-                        score = 0.4
-                
+            for hour, minute, score in zip(hours[top].tolist(), _SLOT_MINUTES[free][top].tolist(),
+                                           scores[top].tolist()):
                 scored_slots.append({
-                    'time': slot.isoformat(),
-                    'time_display': slot.strftime('%H:%M'),
+                    'time': day_start.replace(hour=hour, minute=minute).isoformat(),
+                    'time_display': f'{hour:02d}:{minute:02d}',
                     'score': float(score),
-                    'reason': 'ML recommended' if self.is_trained else 'Heuristic'
+                    'reason': reason
                 })
-            
-            # Sort by score (highest first)
-            scored_slots.sort(key=lambda x: x['score'], reverse=True)
-            return scored_slots[:5]  # Return top 5 suggestions
+            return scored_slots
             
         except Exception as e:
             print(f"Error in suggest_optimal_times: {e}")
@@ -190,22 +356,21 @@ class PatientFlowPredictor:
     
     def __init__(self):
         self.model = None
+        self.predictor = None  # compiled model, when Treelite is installed
         self.is_trained = False
+        self.cache_dir = MODEL_CACHE_DIR
     
-    def train_model(self, appointments_data: List[Dict]):
+    def train_model(self, appointments_data: Union[List[Dict], ApptTable]):
         """Train model on historical data"""
         if len(appointments_data) < 10:
             self.is_trained = False
             return
         
-        try:
-            # Simple heuristic-based model for now
-            # In production, would use more sophisticated ML
-            self.is_trained = True
-        except:
-            self.is_trained = False
+        # Simple heuristic-based model for now
+        # In production, would use more sophisticated ML
+        self.is_trained = True
     
-    def predict_flow(self, date: str, appointments: List[Dict]) -> Dict:
+    def predict_flow(self, date: str, appointments: Union[List[Dict], ApptTable]) -> Dict:
         """Predict patient flow for a given date"""
         try:
             target_date = datetime.fromisoformat(date) if isinstance(date, str) else date
@@ -213,19 +378,16 @@ class PatientFlowPredictor:
                 target_date = datetime.strptime(date, '%Y-%m-%d')
             
             # Count appointments by hour
-            hourly_counts = defaultdict(int)
-            for appt in appointments:
-                try:
-                    appt_time = datetime.fromisoformat(appt['date'])
-                    if appt_time.date() == target_date.date():
-                        hourly_counts[appt_time.hour] += 1
-                except:
-                    continue
+            dates = _as_table(appointments).dates
+            target_day = np.datetime64(target_date.date())
+            on_day = dates.astype('datetime64[D]') == target_day
+            hours = dates[on_day].astype('datetime64[h]').astype(np.int64) % 24
+            hourly_counts = np.bincount(hours, minlength=24)
             
             # Predict busy times
             predicted_peak_hours = []
             for hour in range(9, 17):
-                count = hourly_counts.get(hour, 0)
+                count = int(hourly_counts[hour])
                 if count >= 3:
                     predicted_peak_hours.append({
                         'hour': hour,
@@ -234,8 +396,7 @@ class PatientFlowPredictor:
                     })
             
             # Predict no-shows (simple heuristic: 10% no-show rate)
-            total_appointments = len([a for a in appointments 
-                                    if datetime.fromisoformat(a['date']).date() == target_date.date()])
+            total_appointments = int(on_day.sum())
             predicted_no_shows = int(total_appointments * 0.1)
             
             return {
@@ -251,90 +412,117 @@ class PatientFlowPredictor:
             return {'error': str(e)}
 
 
+# Patterns for common queries, in priority order
+_INTENT_PATTERNS = (
+    ('today_appointments', (
+        r"show.*today.*appointments",
+        r"today.*appointments",
+        r"appointments.*today",
+        r"what.*appointments.*today"
+    )),
+    ('doctor_appointments', (
+        r"show.*appointments.*(?:for|with).*dr\.?\s*(\w+)",
+        r"appointments.*dr\.?\s*(\w+)",
+        r"dr\.?\s*(\w+).*appointments"
+    )),
+    ('patient_search', (
+        r"find.*patient.*(\w+)",
+        r"search.*patient.*(\w+)",
+        r"patient.*named.*(\w+)"
+    )),
+    ('schedule_appointment', (
+        r"schedule.*appointment",
+        r"book.*appointment",
+        r"create.*appointment"
+    )),
+    ('doctor_schedule', (
+        r"show.*schedule.*(?:for|of).*dr\.?\s*(\w+)",
+        r"when.*dr\.?\s*(\w+).*available"
+    )),
+)
+
+# Entity captured by the pattern's group for each intent
+_ENTITY_KEYS = {
+    'doctor_appointments': 'doctor_name',
+    'patient_search': 'patient_name',
+    'doctor_schedule': 'doctor_name'
+}
+
+
+def _compile_intents(intent_patterns):
+    """Fold every pattern into one anchored alternation so a query is scanned once.
+    
+    Each alternative is prefixed with a lazy skip, which keeps re.search
+    semantics while the alternation order preserves intent priority (first
+    listed intent wins). Returns the compiled regex and a map from group name
+    to (intent, index of the entity group or None).
+    """
+    alternatives = []
+    groups = {}
+    group_index = 1
+    for intent, pats in intent_patterns:
+        for i, p in enumerate(pats):
+            name = f'{intent}__{i}'
+            alternatives.append(f'(?P<{name}>(?s:.*?){p})')
+            n_groups = re.compile(p).groups
+            groups[name] = (intent, group_index + 1 if n_groups else None)
+            group_index += 1 + n_groups
+    return re.compile('(?:' + '|'.join(alternatives) + ')'), groups
+
+
+_INTENT_REGEX, _INTENT_GROUPS = _compile_intents(_INTENT_PATTERNS)
+
+
 class NLPQueryProcessor:
     """NLP processor for natural language queries"""
     
     def __init__(self):
-        # Patterns for common queries
-        self.patterns = {
-            'today_appointments': [
-                r"show.*today.*appointments",
-                r"today.*appointments",
-                r"appointments.*today",
-                r"what.*appointments.*today"
-            ],
-            'doctor_appointments': [
-                r"show.*appointments.*(?:for|with).*dr\.?\s*(\w+)",
-                r"appointments.*dr\.?\s*(\w+)",
-                r"dr\.?\s*(\w+).*appointments"
-            ],
-            'patient_search': [
-                r"find.*patient.*(\w+)",
-                r"search.*patient.*(\w+)",
-                r"patient.*named.*(\w+)"
-            ],
-            'schedule_appointment': [
-                r"schedule.*appointment",
-                r"book.*appointment",
-                r"create.*appointment"
-            ],
-            'doctor_schedule': [
-                r"show.*schedule.*(?:for|of).*dr\.?\s*(\w+)",
-                r"when.*dr\.?\s*(\w+).*available"
-            ]
-        }
+        self.patterns = _INTENT_PATTERNS
+        self.entity_keys = _ENTITY_KEYS
+        self.master = _INTENT_REGEX
+        self.groups = _INTENT_GROUPS
+        
+        # Classification depends only on the normalized text, so repeated
+        # queries (dashboard shortcuts etc.) skip the regex entirely
+        self._classify = lru_cache(maxsize=512)(self._match_intent)
+    
+    def _match_intent(self, query_lower: str) -> Tuple[str, Optional[str], Optional[int]]:
+        """Match a normalized query to (intent, entity value, date offset in days)"""
+        match = self.master.match(query_lower)
+        if not match:
+            return 'unknown', None, None
+        
+        intent, entity_group = self.groups[match.lastgroup]
+        entity = match.group(entity_group).title() if entity_group is not None else None
+        
+        day_offset = None
+        if intent == 'today_appointments':
+            day_offset = 0
+        elif intent == 'doctor_appointments':
+            # Check for date keywords
+            if 'today' in query_lower:
+                day_offset = 0
+            elif 'tomorrow' in query_lower:
+                day_offset = 1
+        return intent, entity, day_offset
     
     def parse_query(self, query: str) -> Dict:
         """Parse natural language query"""
-        query_lower = query.lower().strip()
+        # Collapse case and whitespace runs so trivially different phrasings
+        # ("Show  today\nappointments") share one cache entry
+        intent, entity, day_offset = self._classify(' '.join(query.lower().split()))
         
         result = {
-            'intent': 'unknown',
+            'intent': intent,
             'entities': {},
             'original_query': query
         }
-        
-        # Check for today's appointments
-        for pattern in self.patterns['today_appointments']:
-            if re.search(pattern, query_lower):
-                result['intent'] = 'today_appointments'
-                result['entities']['date'] = datetime.now().strftime('%Y-%m-%d')
-                return result
-        
-        # Check for doctor-specific appointments
-        for pattern in self.patterns['doctor_appointments']:
-            match = re.search(pattern, query_lower)
-            if match:
-                result['intent'] = 'doctor_appointments'
-                result['entities']['doctor_name'] = match.group(1).title()
-                # Check for date keywords
-                if 'today' in query_lower:
-                    result['entities']['date'] = datetime.now().strftime('%Y-%m-%d')
-                elif 'tomorrow' in query_lower:
-                    result['entities']['date'] = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
-                return result
-        
-        # Check for patient search
-        for pattern in self.patterns['patient_search']:
-            match = re.search(pattern, query_lower)
-            if match:
-                result['intent'] = 'patient_search'
-                result['entities']['patient_name'] = match.group(1).title()
-                return result
-        
-        # Check for schedule appointment
-        for pattern in self.patterns['schedule_appointment']:
-            if re.search(pattern, query_lower):
-                result['intent'] = 'schedule_appointment'
-                return result
-        
-        # Check for doctor schedule
-        for pattern in self.patterns['doctor_schedule']:
-            match = re.search(pattern, query_lower)
-            if match:
-                result['intent'] = 'doctor_schedule'
-                result['entities']['doctor_name'] = match.group(1).title()
-                return result
+        if entity is not None:
+            result['entities'][self.entity_keys[intent]] = entity
+        # Dates are resolved after the cache so entries stay valid across days;
+        # the clock is read once per call and only when an intent needs it
+        if day_offset is not None:
+            result['entities']['date'] = (datetime.now().date() + timedelta(days=day_offset)).isoformat()
         
         return result
 
@@ -348,13 +536,23 @@ class InventoryAlertSystem:
     
     def check_alerts(self, inventory_items: List[Dict]) -> List[Dict]:
         """Check for inventory alerts"""
-        alerts = []
+        crit = self.critical_threshold
+        low = self.low_stock_threshold
         
-        for item in inventory_items:
+        # Threshold tests run over the whole inventory at once; dicts are only
+        # built for the (few) items that actually alert
+        quantities = np.fromiter((item.get('quantity', 0) for item in inventory_items),
+                                 dtype=np.float64, count=len(inventory_items))
+        critical = quantities <= crit
+        flagged = np.flatnonzero(quantities <= low)
+        
+        alerts = []
+        for i in flagged.tolist():
+            item = inventory_items[i]
             stock_level = item.get('quantity', 0)
             item_name = item.get('name', 'Unknown')
             
-            if stock_level <= self.critical_threshold:
+            if critical[i]:
                 alerts.append({
                     'type': 'critical',
                     'item': item_name,
@@ -362,7 +560,7 @@ class InventoryAlertSystem:
                     'message': f'CRITICAL: {item_name} is running very low ({stock_level} remaining)',
                     'priority': 'high'
                 })
-            elif stock_level <= self.low_stock_threshold:
+            else:
                 alerts.append({
                     'type': 'warning',
                     'item': item_name,
@@ -375,13 +573,23 @@ class InventoryAlertSystem:
     
     def predict_restock_date(self, item: Dict, daily_usage: float = 1.0) -> Optional[str]:
         """Predict when inventory will need restocking"""
-        current_stock = item.get('quantity', 0)
-        if daily_usage <= 0:
-            return None
+        return self.predict_restock_dates([item], daily_usage)[0]
+    
+    def predict_restock_dates(self, items: List[Dict], daily_usages=1.0) -> List[Optional[str]]:
+        """Predict restock dates for many items at once.
+        
+        daily_usages is a single rate or one rate per item. Returns a list
+        aligned with items; None where the usage rate is not positive.
+        """
+        stocks = np.fromiter((item.get('quantity', 0) for item in items),
+                             dtype=np.float64, count=len(items))
+        usages = np.broadcast_to(np.asarray(daily_usages, dtype=np.float64), stocks.shape)
+        has_usage = usages > 0
         
-        days_remaining = current_stock / daily_usage
-        restock_date = datetime.now() + timedelta(days=int(days_remaining))
-        return restock_date.strftime('%Y-%m-%d')
+        days_remaining = np.divide(stocks, usages, out=np.zeros_like(stocks), where=has_usage)
+        days_remaining = np.trunc(days_remaining).astype(np.int64)
+        restock = np.datetime64(datetime.now().date()) + days_remaining.astype('timedelta64[D]')
+        return [d if ok else None for d, ok in zip(restock.astype(str).tolist(), has_usage.tolist())]
 
 
 # Global instances
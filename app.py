@@ -1,78 +1,349 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify
-from models import db, Patient, Doctor, Appointment, InventoryItem
+from flask import Flask, current_app, render_template, request, redirect, url_for, jsonify, stream_with_context
+from sqlalchemy import and_, bindparam, column, event, false, func, text
+from sqlalchemy.orm import joinedload
+from config import Config
+from models import db, set_sqlite_pragmas, Patient, Doctor, Appointment, InventoryItem
 from datetime import datetime, timedelta
-from ai_service import appointment_scheduler, flow_predictor, nlp_processor, inventory_alert
-import json
+from ai_service import appointment_scheduler, flow_predictor, nlp_processor, inventory_alert, ApptTable
+from blueprints.core import bp as core_bp, dashboard_context
+from cache import cached, invalidate
+from json_provider import ORJSON_AVAILABLE, ORJSONProvider
+import numpy as np
+import os
+import threading
+import time
+
+# Bookable half-hour slots, 09:00 to 16:30
+_ALL_SLOTS = tuple(f"{h:02d}:{m:02d}" for h in range(9, 17) for m in (0, 30))
+_ALL_SLOTS_SET = frozenset(_ALL_SLOTS)
+
+# Bump when _upgrade_schema gains a step; the applied version is kept in the meta table
+SCHEMA_VERSION = 5
+
+# Columns switched from ISO strings to DateTime; _upgrade_schema converts old rows
+_DATETIME_COLUMNS = (Appointment.__table__.c.date, InventoryItem.__table__.c.last_restocked)
+
+# Positions for the seeded doctors, backfilled into databases that predate the column
+_DOCTOR_POSITIONS = {
+    'Dr. Arjun Mehta': 'Head of Cardiology',
+    'Dr. Priya Sharma': 'Senior Consultant, Neurology',
+    'Dr. Ramesh Iyer': 'Consultant, Pediatrics',
+    'Dr. Anjali Rao': 'Consultant, Orthopedics',
+    'Dr. Vikram Singh': 'Senior Surgeon',
+    'Dr. Sneha Patel': 'Consultant, Obstetrics & Gynaecology',
+    'Dr. Karan Gupta': 'Dermatologist',
+    'Dr. Neha Kapoor': 'ENT Specialist',
+    'Dr. Amit Desai': 'Head of Radiology',
+    'Dr. Suman Reddy': 'Consultant, Medical Oncology',
+}
+
+# Alert level by how many of the ratio cut-offs (<= 0.6, <= 0.3) an item falls under
+_ALERT_LEVELS = ('low', 'medium', 'high')
+
+# Tables whose name column is searchable through a <table>_fts trigram index
+_NAME_SEARCH_TABLES = ('patient', 'doctor')
+
+# Background retraining runs this often, and only when appointments changed
+RETRAIN_INTERVAL_SECONDS = 30 * 60
 
 
 # ---------------- HELPER FUNCTIONS ----------------
+def stream_json_array(items):
+    """Stream an iterable of dicts as a JSON array, one element at a time"""
+    def dumps(obj):
+        return current_app.json.dumps(obj, separators=(',', ':')).encode()
+
+    def generate():
+        yield b'['
+        for i, item in enumerate(items):
+            if i:
+                yield b','
+            yield dumps(item)
+        yield b']\n'
+
+    # The query behind items runs lazily, so keep the request (and session) alive
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
+
+
+def _add_alert_levels(alerts, items_data):
+    """Set each alert's level from its item's quantity/threshold ratio"""
+    # Look items up by name once instead of rescanning per alert
+    first_by_name = {}
+    for i, item in enumerate(items_data):
+        first_by_name.setdefault(item['name'], i)
+    hits = [(alert, first_by_name[alert['item']]) for alert in alerts if alert['item'] in first_by_name]
+    if not hits:
+        return
+    quantities = np.fromiter((items_data[i]['quantity'] for _, i in hits), dtype=np.float64, count=len(hits))
+    thresholds = np.fromiter((items_data[i]['low_stock_threshold'] for _, i in hits), dtype=np.float64, count=len(hits))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = quantities / thresholds
+    codes = (ratio <= 0.6).astype(np.int64) + (ratio <= 0.3)
+    for (alert, _), code in zip(hits, codes.tolist()):
+        alert['level'] = _ALERT_LEVELS[code]
+
+
+def _names_by_id(model, ids):
+    """{id: name} for the given ids of model, fetched in one query"""
+    if not ids:
+        return {}
+    return dict(db.session.query(model.id, model.name).filter(model.id.in_(ids)).all())
+
+
+def _name_search(model, name):
+    """Rows of model whose name contains name, case-insensitively"""
+    pattern = f'%{name}%'
+    if current_app.config.get('NAME_SEARCH_FTS'):
+        # LIKE against the trigram FTS table is answered from its index
+        ids = text(f"SELECT rowid FROM {model.__tablename__}_fts WHERE name LIKE :pattern")
+        ids = ids.bindparams(pattern=pattern).columns(column('rowid'))
+        return model.query.filter(model.id.in_(ids)).order_by(model.id).all()
+    return model.query.filter(model.name.ilike(pattern)).all()
+
+
+def _parse_datetime(value):
+    """Naive wall-clock datetime from an ISO string; any zone suffix is dropped"""
+    try:
+        return datetime.fromisoformat(value).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        return None
+
+
+def _on_day(day):
+    """SQL criterion for appointments falling on a 'YYYY-MM-DD' day"""
+    start = _parse_datetime(str(day)[:10])
+    if start is None:
+        return false()
+    return and_(Appointment.date >= start, Appointment.date < start + timedelta(days=1))
+
+
+def bulk_insert(model, rows, batch_size=10000):
+    """Insert a list of column dicts with executemany, committing per batch"""
+    for start in range(0, len(rows), batch_size):
+        db.session.bulk_insert_mappings(model, rows[start:start + batch_size])
+        db.session.commit()
+
+
 def _seed_sample_data():
     try:
         if Doctor.query.count() == 0:
             # Seed 10 sample doctors with Indian names and positions
-            sample_doctors = [
-                Doctor(name='Dr. Arjun Mehta', specialization='Cardiologist', position='Head of Cardiology'),
-                Doctor(name='Dr. Priya Sharma', specialization='Neurologist', position='Senior Consultant, Neurology'),
-                Doctor(name='Dr. Ramesh Iyer', specialization='Pediatrician', position='Consultant, Pediatrics'),
-                Doctor(name='Dr. Anjali Rao', specialization='Orthopedics', position='Consultant, Orthopedics'),
-                Doctor(name='Dr. Vikram Singh', specialization='General Surgery', position='Senior Surgeon'),
-                Doctor(name='Dr. Sneha Patel', specialization='Gynecology', position='Consultant, Obstetrics & Gynaecology'),
-                Doctor(name='Dr. Karan Gupta', specialization='Dermatology', position='Dermatologist'),
-                Doctor(name='Dr. Neha Kapoor', specialization='ENT', position='ENT Specialist'),
-                Doctor(name='Dr. Amit Desai', specialization='Radiology', position='Head of Radiology'),
-                Doctor(name='Dr. Suman Reddy', specialization='Oncology', position='Consultant, Medical Oncology'),
-            ]
-            db.session.add_all(sample_doctors)
-            db.session.commit()
+            db.session.bulk_insert_mappings(Doctor, [
+                {'name': 'Dr. Arjun Mehta', 'specialization': 'Cardiologist', 'position': 'Head of Cardiology'},
+                {'name': 'Dr. Priya Sharma', 'specialization': 'Neurologist', 'position': 'Senior Consultant, Neurology'},
+                {'name': 'Dr. Ramesh Iyer', 'specialization': 'Pediatrician', 'position': 'Consultant, Pediatrics'},
+                {'name': 'Dr. Anjali Rao', 'specialization': 'Orthopedics', 'position': 'Consultant, Orthopedics'},
+                {'name': 'Dr. Vikram Singh', 'specialization': 'General Surgery', 'position': 'Senior Surgeon'},
+                {'name': 'Dr. Sneha Patel', 'specialization': 'Gynecology', 'position': 'Consultant, Obstetrics & Gynaecology'},
+                {'name': 'Dr. Karan Gupta', 'specialization': 'Dermatology', 'position': 'Dermatologist'},
+                {'name': 'Dr. Neha Kapoor', 'specialization': 'ENT', 'position': 'ENT Specialist'},
+                {'name': 'Dr. Amit Desai', 'specialization': 'Radiology', 'position': 'Head of Radiology'},
+                {'name': 'Dr. Suman Reddy', 'specialization': 'Oncology', 'position': 'Consultant, Medical Oncology'},
+            ])
         
         # Seed inventory items
         if InventoryItem.query.count() == 0:
-            sample_inventory = [
-                InventoryItem(name='Paracetamol 500mg', category='Medicine', quantity=25, unit='boxes', low_stock_threshold=10),
-                InventoryItem(name='Bandages', category='Supplies', quantity=8, unit='boxes', low_stock_threshold=10),
-                InventoryItem(name='Surgical Gloves', category='Equipment', quantity=15, unit='boxes', low_stock_threshold=5),
-                InventoryItem(name='Antiseptic Solution', category='Medicine', quantity=12, unit='bottles', low_stock_threshold=10),
-                InventoryItem(name='Syringes', category='Equipment', quantity=4, unit='boxes', low_stock_threshold=5),
-            ]
-            db.session.add_all(sample_inventory)
-            db.session.commit()
+            db.session.bulk_insert_mappings(InventoryItem, [
+                {'name': 'Paracetamol 500mg', 'category': 'Medicine', 'quantity': 25, 'unit': 'boxes', 'low_stock_threshold': 10},
+                {'name': 'Bandages', 'category': 'Supplies', 'quantity': 8, 'unit': 'boxes', 'low_stock_threshold': 10},
+                {'name': 'Surgical Gloves', 'category': 'Equipment', 'quantity': 15, 'unit': 'boxes', 'low_stock_threshold': 5},
+                {'name': 'Antiseptic Solution', 'category': 'Medicine', 'quantity': 12, 'unit': 'bottles', 'low_stock_threshold': 10},
+                {'name': 'Syringes', 'category': 'Equipment', 'quantity': 4, 'unit': 'boxes', 'low_stock_threshold': 5},
+            ])
+        
+        # One transaction for the whole seed
+        db.session.commit()
     except Exception as e:
+        db.session.rollback()
         print(f"Error seeding data: {e}")
 
+def _appointment_history():
+    """Dated appointments as model input dicts, with each patient's appointment count"""
+    # One grouped count instead of loading every patient's appointment list
+    history_counts = dict(
+        db.session.query(Patient.id, func.count(Appointment.id))
+        .join(Patient.appointments)
+        .group_by(Patient.id)
+        .all()
+    )
+    rows = (db.session.query(Appointment.date, Appointment.doctor_id, Appointment.patient_id)
+            .filter(Appointment.date.isnot(None))
+            .all())
+    return [{
+        'date': date,
+        'doctor_id': doctor_id,
+        'patient_history_count': history_counts.get(patient_id, 0)
+    } for date, doctor_id, patient_id in rows]
+
+
 def _train_ai_models():
     """Train AI models on existing data"""
     try:
-        all_appts = Appointment.query.all()
-        if len(all_appts) > 0:
-            appts_data = []
-            for appt in all_appts:
-                if appt.date:
-                    try:
-                        patient = Patient.query.get(appt.patient_id)
-                        appts_data.append({
-                            'date': appt.date,
-                            'doctor_id': appt.doctor_id,
-                            'patient_history_count': len(patient.appointments) if patient else 0
-                        })
-                    except:
-                        continue
-            
-            if appts_data:
-                appointment_scheduler.train_model(appts_data)
-                flow_predictor.train_model(appts_data)
+        appts_data = _appointment_history()
+        if appts_data:
+            # Convert once and share the table between both models
+            appts_table = ApptTable.from_dicts(appts_data)
+            appointment_scheduler.train_model(appts_table)
+            flow_predictor.train_model(appts_table)
     except Exception as e:
         print(f"Error training AI models: {e}")
 
 
-def create_app():
+def _start_model_training(app):
+    """Serve the last trained model right away and (re)train on a daemon thread"""
+    appointment_scheduler.load_latest()
+
+    def loop():
+        last_seen = None
+        while True:
+            with app.app_context():
+                try:
+                    seen = db.session.query(func.count(Appointment.id), func.max(Appointment.id)).one()
+                    if seen != last_seen:
+                        _train_ai_models()
+                        last_seen = seen
+                except Exception as e:
+                    print(f"Background training failed: {e}")
+                finally:
+                    db.session.remove()
+            time.sleep(RETRAIN_INTERVAL_SECONDS)
+
+    threading.Thread(target=loop, name='ai-model-training', daemon=True).start()
+
+
+def _upgrade_schema(conn):
+    """Bring a database written by an older version up to SCHEMA_VERSION"""
+    # doctor.position, filled in for the seeded doctors
+    doctor_cols = [row[1] for row in conn.execute(text("PRAGMA table_info(doctor);")).fetchall()]
+    if 'position' not in doctor_cols:
+        conn.execute(text("ALTER TABLE doctor ADD COLUMN position VARCHAR(120);"))
+        print("[DB] Added missing column doctor.position")
+    backfilled = conn.execute(
+        text("UPDATE doctor SET position = :position WHERE name = :name AND (position IS NULL OR position = '')"),
+        [{'name': name, 'position': position} for name, position in _DOCTOR_POSITIONS.items()]
+    ).rowcount
+    if backfilled > 0:
+        print("[DB] Backfilled doctor.position values where missing.")
+
+    # Indexes declared on models are only emitted by create_all for new tables
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_appt_doctor_date ON appointment (doctor_id, date);"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_appt_patient ON appointment (patient_id);"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_appt_date_status ON appointment (date, status);"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_inv_low_stock ON inventory_item (id) "
+                      "WHERE quantity <= low_stock_threshold;"))
+
+    # DateTime columns that used to hold ISO strings: rewrite them in storage format
+    for column_attr in _DATETIME_COLUMNS:
+        table, name = column_attr.table, column_attr.name
+        legacy = conn.execute(text(
+            f"SELECT id, {name} FROM {table.name} WHERE {name} IS NOT NULL AND {name} NOT GLOB "
+            "'[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9] [0-9][0-9]:[0-9][0-9]:[0-9][0-9]*'"
+        )).fetchall()
+        if legacy:
+            converted = [{'row_id': row_id, 'when': _parse_datetime(raw), 'raw': raw}
+                         for row_id, raw in legacy]
+            # Unparseable text can't stay in a DateTime column (reading it back raises),
+            # so it is cleared; log it first so the original values aren't lost
+            for row in converted:
+                if row['when'] is None:
+                    print(f"[DB] {table.name}.{name} id={row['row_id']}: "
+                          f"unparseable value {row['raw']!r} set to NULL")
+            conn.execute(
+                table.update()
+                .where(table.c.id == bindparam('row_id'))
+                .values({name: bindparam('when')}),
+                converted
+            )
+            print(f"[DB] Converted {len(legacy)} {table.name}.{name} values to DateTime")
+
+# ---------------- NLP QUERY HANDLERS ----------------
+# Each takes the parsed entities and returns the 'results' list for ai_nlp_query
+def _nlp_today_appointments(entities):
+    date = datetime.now().strftime('%Y-%m-%d')
+    appts = Appointment.query.filter(_on_day(date)).all()
+    patient_names = _names_by_id(Patient, {appt.patient_id for appt in appts})
+    doctor_names = _names_by_id(Doctor, {appt.doctor_id for appt in appts})
+    return [{
+        'patient': patient_names.get(appt.patient_id, 'Unknown'),
+        'doctor': doctor_names.get(appt.doctor_id, 'Unknown'),
+        'time': appt.date.isoformat(),
+        'status': appt.status
+    } for appt in appts]
+
+
+def _nlp_doctor_appointments(entities):
+    doctors = _name_search(Doctor, entities.get('doctor_name', ''))
+    if not doctors:
+        return []
+    doctor_names = {d.id: d.name for d in doctors}
+    appts_query = Appointment.query.filter(Appointment.doctor_id.in_(doctor_names))
+    date = entities.get('date', '')
+    if date:
+        appts_query = appts_query.filter(_on_day(date))
+    appts = appts_query.order_by(Appointment.id).all()
+    patient_names = _names_by_id(Patient, {appt.patient_id for appt in appts})
+    return [{
+        'patient': patient_names.get(appt.patient_id, 'Unknown'),
+        'doctor': doctor_names[appt.doctor_id],
+        'time': appt.date.isoformat() if appt.date else None,
+        'status': appt.status
+    } for appt in appts]
+
+
+def _nlp_patient_search(entities):
+    return [{
+        'id': patient.id,
+        'name': patient.name,
+        'contact': patient.contact,
+        'dob': patient.dob
+    } for patient in _name_search(Patient, entities.get('patient_name', ''))]
+
+
+def _nlp_doctor_schedule(entities):
+    doctors = _name_search(Doctor, entities.get('doctor_name', ''))
+    if not doctors:
+        return []
+    # One query for every matched doctor's appointments, in booking order,
+    # split per doctor below
+    schedules = {d.id: [] for d in doctors}
+    appts = (Appointment.query
+             .filter(Appointment.doctor_id.in_(schedules), Appointment.date.isnot(None))
+             .order_by(Appointment.id)
+             .all())
+    patient_names = _names_by_id(Patient, {appt.patient_id for appt in appts})
+    for appt in appts:
+        schedules[appt.doctor_id].append({
+            'date': appt.date.isoformat(),
+            'patient': patient_names.get(appt.patient_id, 'Unknown'),
+            'status': appt.status
+        })
+    return [{
+        'doctor': doctor.name,
+        'specialization': doctor.specialization,
+        'appointments': schedules[doctor.id]
+    } for doctor in doctors]
+
+
+# Intents without a handler (schedule_appointment, unknown) return no results
+_NLP_HANDLERS = {
+    'today_appointments': _nlp_today_appointments,
+    'doctor_appointments': _nlp_doctor_appointments,
+    'patient_search': _nlp_patient_search,
+    'doctor_schedule': _nlp_doctor_schedule,
+}
+
+
+def create_app(background_training=True):
     app = Flask(__name__)
+    if ORJSON_AVAILABLE:
+        app.json = ORJSONProvider(app)
     # Use an absolute path for the SQLite DB to avoid confusion about working directory / instance folder
     # This ensures the file is always created alongside this app.py, not silently in an instance folder.
     import pathlib
     base_dir = pathlib.Path(__file__).parent.resolve()
     db_path = base_dir / "meditrack.db"
     app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config.from_object(Config)
     app.secret_key = 'dev-secret-key-change-in-production'
     print(f"[DB] Using SQLite database at: {db_path}")
 
@@ -81,6 +352,7 @@ def create_app():
 
     # Initialize database tables and data
     with app.app_context():
+        event.listen(db.engine, 'connect', set_sqlite_pragmas)
         try:
             db.create_all()
             print("Database initialized successfully")
@@ -90,55 +362,64 @@ def create_app():
                 print("Database tables already exist, continuing...")
             else:
                 print(f"Database initialization warning: {error_msg}")
-        # --- Lightweight schema upgrade: ensure new columns exist without manual intervention ---
+        # --- One-time upgrades of older databases, gated on meta.schema_version ---
         try:
-            from sqlalchemy import text
-            with db.engine.connect() as conn:
-                doctor_cols = [row[1] for row in conn.execute(text("PRAGMA table_info(doctor);")).fetchall()]
-                if 'position' not in doctor_cols:
-                    conn.execute(text("ALTER TABLE doctor ADD COLUMN position VARCHAR(120);"))
-                print("[DB] Added missing column doctor.position")
+            with db.engine.begin() as conn:
+                conn.execute(text("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"))
+                version = conn.execute(text("SELECT value FROM meta WHERE key = 'schema_version'")).scalar()
+                if int(version or 0) < SCHEMA_VERSION:
+                    _upgrade_schema(conn)
+                    conn.execute(text("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', :version)"),
+                                 {'version': str(SCHEMA_VERSION)})
         except Exception as se:
             print(f"[DB] Schema check/upgrade skipped or failed: {se}")
 
-        # --- Fill doctor positions for existing rows if empty ---
+        # --- Trigram FTS5 indexes so name search by substring doesn't scan the tables ---
+        app.config['NAME_SEARCH_FTS'] = False
         try:
-            mapping = {
-                'Dr. Arjun Mehta':'Head of Cardiology',
-                'Dr. Priya Sharma':'Senior Consultant, Neurology',
-                'Dr. Ramesh Iyer':'Consultant, Pediatrics',
-                'Dr. Anjali Rao':'Consultant, Orthopedics',
-                'Dr. Vikram Singh':'Senior Surgeon',
-                'Dr. Sneha Patel':'Consultant, Obstetrics & Gynaecology',
-                'Dr. Karan Gupta':'Dermatologist',
-                'Dr. Neha Kapoor':'ENT Specialist',
-                'Dr. Amit Desai':'Head of Radiology',
-                'Dr. Suman Reddy':'Consultant, Medical Oncology',
-            }
-            changed = False
-            for d in Doctor.query.all():
-                if (not getattr(d, 'position', None)) and d.name in mapping:
-                    d.position = mapping[d.name]
-                    changed = True
-            if changed:
-                db.session.commit()
-                print("[DB] Backfilled doctor.position values where missing.")
+            with db.engine.begin() as conn:
+                for table in _NAME_SEARCH_TABLES:
+                    fts = f'{table}_fts'
+                    synced = conn.execute(text(
+                        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = :name"
+                    ), {'name': f'{fts}_ai'}).first()
+                    if synced:
+                        continue
+                    # Triggers go away with the table (e.g. fix_db's drop_all), so a
+                    # missing trigger means the index has to be rebuilt from scratch
+                    conn.execute(text(
+                        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                        f"name, content='{table}', content_rowid='id', tokenize='trigram')"
+                    ))
+                    conn.execute(text(
+                        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+                        f"INSERT INTO {fts}(rowid, name) VALUES (new.id, new.name); END"
+                    ))
+                    conn.execute(text(
+                        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+                        f"INSERT INTO {fts}({fts}, rowid, name) VALUES ('delete', old.id, old.name); END"
+                    ))
+                    conn.execute(text(
+                        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF name ON {table} BEGIN "
+                        f"INSERT INTO {fts}({fts}, rowid, name) VALUES ('delete', old.id, old.name); "
+                        f"INSERT INTO {fts}(rowid, name) VALUES (new.id, new.name); END"
+                    ))
+                    conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+            app.config['NAME_SEARCH_FTS'] = True
         except Exception as fe:
-            print(f"[DB] Position backfill skipped or failed: {fe}")
-        
+            print(f"[DB] Name search index skipped or failed, using LIKE scans: {fe}")
+
         _seed_sample_data()
-        _train_ai_models()
+
+    if background_training:
+        _start_model_training(app)
 
     # ---------------- ROUTES ----------------
     @app.route('/')
+    @cached('page:index', ttl=60)
     def index():
-        patients = Patient.query.order_by(Patient.id.desc()).all()
-        total_patients = len(patients)
-        total_doctors = Doctor.query.count()
-        return render_template('index.html',
-                               patients=patients,
-                               total_patients=total_patients,
-                               total_doctors=total_doctors)
+        context = dashboard_context(request.args.get('page', 1, type=int))
+        return render_template('index.html', **context)
 
     @app.route('/patients/new', methods=['GET', 'POST'])
     def new_patient():
@@ -149,6 +430,7 @@ def create_app():
             new_patient = Patient(name=name, dob=dob, contact=contact)
             db.session.add(new_patient)
             db.session.commit()
+            invalidate('page:index', 'admin:stats')
             return redirect(url_for('index'))
         return render_template('patient_form.html')
 
@@ -160,7 +442,13 @@ def create_app():
 
     @app.route('/doctors')
     def doctors():
-        doctors = Doctor.query.all()
+        # Count each doctor's appointments in the same query rather than lazy-loading
+        # every doctor's appointment list from the template
+        doctors = (db.session.query(Doctor, func.count(Appointment.id))
+                   .outerjoin(Doctor.appointments)
+                   .group_by(Doctor.id)
+                   .order_by(Doctor.id)
+                   .all())
         return render_template('doctors.html', doctors=doctors)
 
     @app.route('/reports')
@@ -245,6 +533,7 @@ def create_app():
 
     # ---------------- API ENDPOINTS ----------------
     @app.route('/api/reports/appointments')
+    @cached('report:appointments', ttl=60)
     def get_report_data():
         return jsonify({
             "total": 25,
@@ -257,40 +546,11 @@ def create_app():
     @app.route('/api/get_slots/<int:doctor_id>/<date>')
     def get_slots(doctor_id, date):
         """Return list of available time slots"""
-        def generate_slots(start_h=9, end_h=17, interval=30):
-            slots = []
-            cur_minutes = start_h * 60
-            end_minutes = end_h * 60
-            while cur_minutes < end_minutes:
-                hh = cur_minutes // 60
-                mm = cur_minutes % 60
-                slots.append(f"{hh:02d}:{mm:02d}")
-                cur_minutes += interval
-            return slots
-
-        all_slots = generate_slots()
-        appts = Appointment.query.filter_by(doctor_id=doctor_id).all()
-        occupied = set()
-        
-        for a in appts:
-            if not a.date:
-                continue
-            try:
-                dt = datetime.fromisoformat(a.date)
-                adate = dt.date().isoformat()
-                atime = dt.time().strftime('%H:%M')
-            except Exception:
-                s = a.date
-                adate = s.split('T')[0] if 'T' in s else s
-                atime = ''
-                try:
-                    atime = s.split('T')[1][:5]
-                except Exception:
-                    atime = ''
-            if adate == date and atime:
-                occupied.add(atime)
+        appts = Appointment.query.filter(Appointment.doctor_id == doctor_id, _on_day(date)).all()
+        occupied = {a.date.strftime('%H:%M') for a in appts}
 
-        free = [s for s in all_slots if s not in occupied]
+        # Zero-padded "HH:MM" strings sort chronologically
+        free = sorted(_ALL_SLOTS_SET - occupied)
         return jsonify(free)
 
     @app.route('/api/appointments/new', methods=['POST'])
@@ -301,31 +561,30 @@ def create_app():
         appointment_date = data.get('appointment_date')
         if not (patient_id and doctor_id and appointment_date):
             return jsonify({'error': 'missing fields'}), 400
-        appt = Appointment(patient_id=patient_id, doctor_id=doctor_id, date=appointment_date, status='Scheduled')
+        when = _parse_datetime(appointment_date)
+        if when is None:
+            return jsonify({'error': 'invalid appointment_date'}), 400
+        appt = Appointment(patient_id=patient_id, doctor_id=doctor_id, date=when, status='Scheduled')
         db.session.add(appt)
         db.session.commit()
+        invalidate('admin:stats')
         return jsonify({'ok': True}), 201
 
     @app.route('/api/appointments')
     def api_list_appointments():
-        appts = Appointment.query.order_by(Appointment.id.desc()).all()
-        out = []
-        for a in appts:
-            try:
-                dt = datetime.fromisoformat(a.date) if a.date else None
-                adate = dt.isoformat() if dt else a.date
-            except Exception:
-                adate = a.date
-            patient = Patient.query.get(a.patient_id)
-            doctor = Doctor.query.get(a.doctor_id)
-            out.append({
-                'id': a.id,
-                'patient': patient.name if patient else 'Unknown',
-                'doctor': doctor.name if doctor else 'Unknown',
-                'appointment_date': adate,
-                'status': a.status
-            })
-        return jsonify(out)
+        # Load patient and doctor in the same query instead of two lookups per row,
+        # and stream rows from the cursor in batches rather than loading them all
+        appts = (Appointment.query
+                 .options(joinedload(Appointment.patient), joinedload(Appointment.doctor))
+                 .order_by(Appointment.id.desc())
+                 .yield_per(500))
+        return stream_json_array({
+            'id': a.id,
+            'patient': a.patient.name if a.patient else 'Unknown',
+            'doctor': a.doctor.name if a.doctor else 'Unknown',
+            'appointment_date': a.date.isoformat() if a.date else None,
+            'status': a.status
+        } for a in appts)
 
     @app.route('/api/appointments/<int:appt_id>', methods=['DELETE'])
     def api_delete_appointment(appt_id):
@@ -334,6 +593,7 @@ def create_app():
             return jsonify({'error': 'not found'}), 404
         db.session.delete(a)
         db.session.commit()
+        invalidate('admin:stats')
         return jsonify({'ok': True}), 200
 
     @app.route('/api/patients/<int:patient_id>', methods=['DELETE'])
@@ -344,6 +604,7 @@ def create_app():
         Appointment.query.filter_by(patient_id=patient_id).delete()
         db.session.delete(p)
         db.session.commit()
+        invalidate('page:index', 'admin:stats')
         return jsonify({'ok': True}), 200
 
     # ---------------- AI ENDPOINTS ----------------
@@ -356,37 +617,23 @@ def create_app():
         if not doctor_id or not date:
             return jsonify({'error': 'doctor_id and date required'}), 400
         
-        existing_appts = Appointment.query.filter_by(doctor_id=doctor_id).all()
-        existing_appts_data = []
-        for appt in existing_appts:
-            try:
-                if appt.date and appt.date.startswith(date):
-                    existing_appts_data.append({
-                        'date': appt.date,
-                        'doctor_id': appt.doctor_id
-                    })
-            except:
-                continue
+        existing_appts = Appointment.query.filter(Appointment.doctor_id == doctor_id, _on_day(date)).all()
+        existing_appts_data = [{
+            'date': appt.date,
+            'doctor_id': appt.doctor_id
+        } for appt in existing_appts]
         
-        all_appts = Appointment.query.all()
-        history_data = []
-        for appt in all_appts:
-            if appt.date:
-                try:
-                    patient = Patient.query.get(appt.patient_id)
-                    history_data.append({
-                        'date': appt.date,
-                        'doctor_id': appt.doctor_id,
-                        'patient_history_count': len(patient.appointments) if patient else 0
-                    })
-                except:
-                    continue
+        # The scheduler only needs to know some history exists, not the rows themselves
+        has_history = (db.session.query(Appointment.id)
+                       .filter(Appointment.date.isnot(None))
+                       .limit(1)
+                       .first()) is not None
         
         suggestions = appointment_scheduler.suggest_optimal_times(
             doctor_id=doctor_id,
             date=date,
             existing_appointments=existing_appts_data,
-            appointments_history=history_data
+            appointments_history=has_history
         )
         
         return jsonify({
@@ -398,23 +645,14 @@ def create_app():
     @app.route('/api/ai/predict-flow', methods=['POST'])
     def ai_predict_flow():
         data = request.get_json(force=True)
-        date = data.get('date', datetime.now().strftime('%Y-%m-%d'))
+        date = data.get('date')
+        if date is None:
+            # Only read the clock when the caller didn't pick a day
+            date = datetime.now().strftime('%Y-%m-%d')
         
-        all_appts = Appointment.query.all()
-        appts_data = []
-        for appt in all_appts:
-            try:
-                if appt.date:
-                    dt = datetime.fromisoformat(appt.date)
-                    if dt.strftime('%Y-%m-%d') == date:
-                        appts_data.append({
-                            'date': appt.date,
-                            'doctor_id': appt.doctor_id,
-                            'patient_id': appt.patient_id,
-                            'status': appt.status
-                        })
-            except:
-                continue
+        # The day filter runs in SQL; fetch only the columns the predictor reads
+        day_rows = db.session.query(Appointment.date, Appointment.doctor_id).filter(_on_day(date)).all()
+        appts_data = [{'date': when, 'doctor_id': doctor_id} for when, doctor_id in day_rows]
         
         prediction = flow_predictor.predict_flow(date, appts_data)
         return jsonify(prediction)
@@ -434,81 +672,15 @@ def create_app():
             'results': []
         }
         
-        if parsed['intent'] == 'today_appointments':
-            date = datetime.now().strftime('%Y-%m-%d')
-            appts = Appointment.query.all()
-            for appt in appts:
-                try:
-                    if appt.date and appt.date.startswith(date):
-                        patient = Patient.query.get(appt.patient_id)
-                        doctor = Doctor.query.get(appt.doctor_id)
-                        result['results'].append({
-                            'patient': patient.name if patient else 'Unknown',
-                            'doctor': doctor.name if doctor else 'Unknown',
-                            'time': appt.date,
-                            'status': appt.status
-                        })
-                except:
-                    continue
-        
-        elif parsed['intent'] == 'doctor_appointments':
-            doctor_name = parsed['entities'].get('doctor_name', '')
-            date = parsed['entities'].get('date', '')
-            
-            doctors = Doctor.query.filter(Doctor.name.ilike(f'%{doctor_name}%')).all()
-            if doctors:
-                doctor_ids = [d.id for d in doctors]
-                appts = Appointment.query.filter(Appointment.doctor_id.in_(doctor_ids)).all()
-                
-                for appt in appts:
-                    try:
-                        if not date or (appt.date and appt.date.startswith(date)):
-                            patient = Patient.query.get(appt.patient_id)
-                            doctor = Doctor.query.get(appt.doctor_id)
-                            result['results'].append({
-                                'patient': patient.name if patient else 'Unknown',
-                                'doctor': doctor.name if doctor else 'Unknown',
-                                'time': appt.date,
-                                'status': appt.status
-                            })
-                    except:
-                        continue
-        
-        elif parsed['intent'] == 'patient_search':
-            patient_name = parsed['entities'].get('patient_name', '')
-            patients = Patient.query.filter(Patient.name.ilike(f'%{patient_name}%')).all()
-            for patient in patients:
-                result['results'].append({
-                    'id': patient.id,
-                    'name': patient.name,
-                    'contact': patient.contact,
-                    'dob': patient.dob
-                })
-        
-        elif parsed['intent'] == 'doctor_schedule':
-            doctor_name = parsed['entities'].get('doctor_name', '')
-            doctors = Doctor.query.filter(Doctor.name.ilike(f'%{doctor_name}%')).all()
-            for doctor in doctors:
-                appts = Appointment.query.filter_by(doctor_id=doctor.id).all()
-                schedule = []
-                for appt in appts:
-                    if appt.date:
-                        patient = Patient.query.get(appt.patient_id)
-                        schedule.append({
-                            'date': appt.date,
-                            'patient': patient.name if patient else 'Unknown',
-                            'status': appt.status
-                        })
-                result['results'].append({
-                    'doctor': doctor.name,
-                    'specialization': doctor.specialization,
-                    'appointments': schedule
-                })
+        handler = _NLP_HANDLERS.get(parsed['intent'])
+        if handler is not None:
+            result['results'] = handler(parsed['entities'])
         
         return jsonify(result)
     
     # ---------------- INVENTORY ENDPOINTS ----------------
     @app.route('/api/inventory')
+    @cached('inv:list', ttl=30)
     def api_list_inventory():
         items = InventoryItem.query.all()
         return jsonify([{
@@ -518,7 +690,7 @@ def create_app():
             'quantity': item.quantity,
             'unit': item.unit,
             'low_stock_threshold': item.low_stock_threshold,
-            'last_restocked': item.last_restocked
+            'last_restocked': item.last_restocked.isoformat() if item.last_restocked else None
         } for item in items])
     
     @app.route('/api/inventory', methods=['POST'])
@@ -530,10 +702,11 @@ def create_app():
             quantity=data.get('quantity', 0),
             unit=data.get('unit', 'units'),
             low_stock_threshold=data.get('low_stock_threshold', 10),
-            last_restocked=datetime.now().isoformat()
+            last_restocked=datetime.now()
         )
         db.session.add(item)
         db.session.commit()
+        invalidate('inv:list', 'inv:alerts', 'admin:stats')
         return jsonify({'ok': True, 'id': item.id}), 201
     
     @app.route('/api/inventory/<int:item_id>', methods=['PUT'])
@@ -553,6 +726,7 @@ def create_app():
             item.low_stock_threshold = data['low_stock_threshold']
         
         db.session.commit()
+        invalidate('inv:list', 'inv:alerts', 'admin:stats')
         return jsonify({'ok': True})
     
     @app.route('/api/inventory/<int:item_id>', methods=['DELETE'])
@@ -562,11 +736,15 @@ def create_app():
             return jsonify({'error': 'not found'}), 404
         db.session.delete(item)
         db.session.commit()
+        invalidate('inv:list', 'inv:alerts', 'admin:stats')
         return jsonify({'ok': True})
     
     @app.route('/api/inventory/alerts')
+    @cached('inv:alerts', ttl=60)
     def api_inventory_alerts():
-        items = InventoryItem.query.all()
+        # Only the columns the alert checks read; the notes TEXT is never touched
+        items = db.session.query(InventoryItem.id, InventoryItem.name,
+                                 InventoryItem.quantity, InventoryItem.low_stock_threshold).all()
         items_data = [{
             'id': item.id,
             'name': item.name,
@@ -575,15 +753,21 @@ def create_app():
         } for item in items]
         
         alerts = inventory_alert.check_alerts(items_data)
+        _add_alert_levels(alerts, items_data)
         return jsonify({
             'alerts': alerts,
             'count': len(alerts)
         })
 
+    # Admin dashboard API
+    app.register_blueprint(core_bp)
+
     return app
 
 
 # ---------------- MAIN ----------------
 if __name__ == '__main__':
+    # Development server only; serve wsgi:app with gunicorn in production.
+    # FLASK_DEV=1 turns on the reloader and debugger
     app = create_app()
-    app.run(debug=True, host='127.0.0.1', port=5000)
+    app.run(debug=bool(os.getenv('FLASK_DEV')), host='127.0.0.1', port=5000)
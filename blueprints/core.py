@@ -0,0 +1,87 @@
+from flask import Blueprint, current_app, jsonify
+from werkzeug.exceptions import HTTPException
+from sqlalchemy import bindparam, func, select
+from cache import cached
+from models import db, Patient, Doctor, Appointment, InventoryItem
+from datetime import datetime, timedelta
+
+bp = Blueprint('core', __name__)
+
+# Built once at import: every request reuses the statement and its cached compiled
+# form, binding only the day's bounds. One round-trip, each count a scalar subquery
+_STATS_STMT = select(
+    select(func.count()).where(Appointment.date >= bindparam('today'),
+                               Appointment.date < bindparam('tomorrow')).scalar_subquery(),
+    select(func.count()).select_from(Doctor).scalar_subquery(),
+    select(func.count()).select_from(Patient).scalar_subquery(),
+    select(func.count()).where(
+        InventoryItem.quantity <= InventoryItem.low_stock_threshold).scalar_subquery(),
+)
+
+
+# Patients listed per page of the dashboard
+RECENT_PATIENTS = 8
+
+
+def dashboard_context(page):
+    """Template variables for a page of the dashboard's patient list"""
+    # Both totals from one Core SELECT (no ORM Query wrapping), and only the
+    # columns of the rows the dashboard lists
+    total_patients, total_doctors = db.session.execute(select(
+        select(func.count()).select_from(Patient).scalar_subquery(),
+        select(func.count()).select_from(Doctor).scalar_subquery(),
+    )).one()
+    # Page through the list by the count above rather than paginate()'s own COUNT
+    pages = max(-(-total_patients // RECENT_PATIENTS), 1)
+    page = min(max(page, 1), pages)
+    patients = (db.session.query(Patient.id, Patient.name, Patient.contact, Patient.dob)
+                .order_by(Patient.id.desc())
+                .offset((page - 1) * RECENT_PATIENTS)
+                .limit(RECENT_PATIENTS)
+                .all())
+    return {
+        'patients': patients,
+        'page': page,
+        'pages': pages,
+        'total_patients': total_patients,
+        'total_doctors': total_doctors,
+    }
+
+
+@bp.errorhandler(Exception)
+def api_error(e):
+    """Unexpected errors in these views come back as JSON; HTTP errors pass through"""
+    if isinstance(e, HTTPException):
+        return e
+    current_app.logger.exception('Admin API request failed')
+    return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/api/admin/stats')
+@cached('admin:stats', ttl=15)
+def admin_stats():
+    """Get admin dashboard statistics"""
+    # Appointment.date is a DateTime column: count today's rows with a range scan
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    tomorrow = today + timedelta(days=1)
+    today_appointments, active_doctors, total_patients, low_stock = db.session.execute(
+        _STATS_STMT, {'today': today, 'tomorrow': tomorrow}).one()
+
+    return jsonify({
+        'todayAppointments': today_appointments,
+        'activeDoctors': active_doctors,
+        'lowStockItems': low_stock,
+        'totalPatients': total_patients
+    })
+
+
+@bp.route('/api/admin/settings', methods=['POST'])
+def update_admin_settings():
+    """Update admin settings"""
+    return jsonify({'status': 'success'})
+
+
+@bp.route('/api/admin/password', methods=['POST'])
+def update_admin_password():
+    """Update admin password"""
+    return jsonify({'status': 'success'})
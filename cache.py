@@ -0,0 +1,36 @@
+from flask import Response, make_response, request, session
+from functools import wraps
+import time
+
+# key -> {query string -> (expires_at, body, mimetype)} for near-static GET endpoints
+_response_cache = {}
+
+# Query strings are client-controlled; start a key over rather than grow without bound
+_MAX_VARIANTS = 64
+
+
+def cached(key, ttl=60):
+    """Serve a view from an in-process cache for ttl seconds"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # A page carrying pending flash messages is per-user; render it fresh
+            if '_flashes' in session:
+                return view(*args, **kwargs)
+            variants = _response_cache.setdefault(key, {})
+            hit = variants.get(request.query_string)
+            if hit and hit[0] > time.monotonic():
+                return Response(hit[1], mimetype=hit[2])
+            resp = make_response(view(*args, **kwargs))
+            if resp.status_code == 200:
+                if len(variants) >= _MAX_VARIANTS:
+                    variants.clear()
+                variants[request.query_string] = (time.monotonic() + ttl, resp.get_data(), resp.mimetype)
+            return resp
+        return wrapper
+    return decorator
+
+
+def invalidate(*keys):
+    for key in keys:
+        _response_cache.pop(key, None)
@@ -0,0 +1,7 @@
+class Config:
+    """Settings shared by every create_app(); each app adds its own URI and secret key"""
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Keep connections (and their per-connection PRAGMAs) around for concurrent requests
+    SQLALCHEMY_ENGINE_OPTIONS = {'pool_size': 10}
+    # Every form and JSON body here is tiny; reject oversized ones before parsing
+    MAX_CONTENT_LENGTH = 16 * 1024
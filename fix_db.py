@@ -3,10 +3,12 @@ Script to fix database schema issues by recreating tables
 Run this if you get "table already exists" errors
 """
 
-from app import create_app
+from sqlalchemy import text
+from app import create_app, _seed_sample_data
 from models import db, Patient, Doctor, Appointment, InventoryItem
 
-app = create_app()
+# No background training: the tables are about to be dropped
+app = create_app(background_training=False)
 
 with app.app_context():
     # Drop all tables (WARNING: This will delete all data!)
@@ -19,7 +21,9 @@ with app.app_context():
     
     # Seed sample data
     print("Seeding sample data...")
-    from app import _seed_sample_data
+    # Throwaway data: skip the fsync on the seed's commit. The setting only lives on
+    # this script's connections, which close when it exits
+    db.session.execute(text('PRAGMA synchronous=OFF'))
     _seed_sample_data()
     
     print("Database fixed! You can now run the server.")
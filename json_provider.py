@@ -0,0 +1,37 @@
+from flask.json.provider import DefaultJSONProvider
+import importlib.util
+
+# Optional: orjson encodes and decodes JSON in C
+ORJSON_AVAILABLE = importlib.util.find_spec('orjson') is not None
+if ORJSON_AVAILABLE:
+    import orjson
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask's default JSON provider with orjson doing the work"""
+
+    def _dumpb(self, obj, option=0):
+        # Dates and dataclasses go through Flask's default() so the output
+        # matches DefaultJSONProvider's; keys are sorted like sort_keys=True
+        option |= (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+                   | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        # orjson output is always compact; anything else (e.g. indent) is json.dumps' job
+        if kwargs.keys() - {'separators'}:
+            return super().dumps(obj, **kwargs)
+        return self._dumpb(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Pretty-printed debug output isn't a hot path; leave it to json.dumps
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumpb(obj, orjson.OPT_APPEND_NEWLINE),
+                                        mimetype=self.mimetype)
@@ -2,12 +2,22 @@ from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
 
+def set_sqlite_pragmas(dbapi_conn, _record):
+    """WAL lets readers run alongside a writer; NORMAL sync is safe under WAL"""
+    cursor = dbapi_conn.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=268435456')
+    cursor.execute('PRAGMA cache_size=-65536')
+    cursor.close()
+
 class Patient(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     dob = db.Column(db.String(20))
     contact = db.Column(db.String(15))
-    appointments = db.relationship('Appointment', backref='patient', lazy=True)
+    appointments = db.relationship('Appointment', back_populates='patient', lazy='select')
 
 class Doctor(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -15,21 +25,39 @@ class Doctor(db.Model):
     specialization = db.Column(db.String(100))
     # position/role within the hospital (e.g. Consultant, Head of Dept)
     position = db.Column(db.String(120))
-    appointments = db.relationship('Appointment', backref='doctor', lazy=True)
+    appointments = db.relationship('Appointment', back_populates='doctor', lazy='select')
 
 class Appointment(db.Model):
+    # (doctor_id, date) backs per-doctor day lookups such as slot availability and
+    # (date, status) whole-clinic day counts; with ix_appt_patient they also cover
+    # both foreign keys
+    __table_args__ = (
+        db.Index('ix_appt_doctor_date', 'doctor_id', 'date'),
+        db.Index('ix_appt_patient', 'patient_id'),
+        db.Index('ix_appt_date_status', 'date', 'status'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     patient_id = db.Column(db.Integer, db.ForeignKey('patient.id'))
     doctor_id = db.Column(db.Integer, db.ForeignKey('doctor.id'))
-    date = db.Column(db.String(50))
+    date = db.Column(db.DateTime)  # naive wall-clock time
     status = db.Column(db.String(20), default='Scheduled')
+    # Lazy on both sides: most appointment queries only need the foreign keys, and
+    # the listings that show names ask for joinedload() explicitly
+    patient = db.relationship('Patient', back_populates='appointments', lazy='select')
+    doctor = db.relationship('Doctor', back_populates='appointments', lazy='select')
 
 class InventoryItem(db.Model):
+    # Partial index holding only low-stock rows, so counting them reads just those
+    __table_args__ = (
+        db.Index('ix_inv_low_stock', 'id', sqlite_where=db.text('quantity <= low_stock_threshold')),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     category = db.Column(db.String(50))  # e.g., 'Medicine', 'Equipment', 'Supplies'
     quantity = db.Column(db.Integer, default=0)
     unit = db.Column(db.String(20), default='units')  # e.g., 'boxes', 'pieces', 'ml'
     low_stock_threshold = db.Column(db.Integer, default=10)
-    last_restocked = db.Column(db.String(50))
+    last_restocked = db.Column(db.DateTime)
     notes = db.Column(db.Text)
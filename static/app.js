@@ -204,7 +204,8 @@ document.addEventListener('DOMContentLoaded', () => {
         alert('Please fill required fields');
         return;
       }
-      const iso = new Date(`${date}T${time}:00`).toISOString();
+      // Send the wall-clock time as picked; the server stores times without a zone
+      const iso = `${date}T${time}:00`;
       try {
         await fetchJSON('/api/appointments/new', {
           method: 'POST',
@@ -0,0 +1,5 @@
+from app import create_app
+
+# Production entry point, e.g.
+#   gunicorn -w 2 -k gthread --threads 8 --worker-tmp-dir /dev/shm wsgi:app
+app = create_app()